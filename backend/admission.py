@@ -0,0 +1,154 @@
+"""
+Admission control for upload endpoints.
+
+Each media type has its own lane with a fixed capacity (uploads admitted
+but not yet finished: queued + being analysed), so a backlog of long videos
+can't starve cheap image jobs. Each user may also only have a few uploads in
+flight. The ASGI middleware makes the decision from the path, query string
+and Content-Length, before the multipart body is read, and rejects with
+503/429 + Retry-After (or 413) straight away.
+
+The admitted Ticket is left in the request state; whoever finishes the
+upload (the pipeline) releases it. If the endpoint fails before handing the
+ticket off, the middleware releases it.
+"""
+
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+import json
+import math
+import time
+
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[int] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class Ticket:
+    def __init__(self, lane: str, user_id: str):
+        self.lane = lane
+        self.user_id = user_id
+        self.admitted_at = time.monotonic()
+        self.handed_off = False
+        self.released = False
+
+
+class Lane:
+    def __init__(self, capacity: int, workers: int, initial_estimate: float):
+        self.capacity = capacity
+        self.workers = max(1, workers)
+        self.in_flight = 0
+        self.rejected = 0
+        # EWMA of seconds from admission to completion
+        self.avg_seconds = initial_estimate
+
+
+class AdmissionController:
+    def __init__(self, lanes: Dict[str, Lane], max_per_user: int):
+        self.lanes = lanes
+        self.max_per_user = max_per_user
+        self._per_user: Dict[str, int] = {}
+
+    def admit(self, lane_name: str, user_id: str) -> Ticket:
+        lane = self.lanes[lane_name]
+        if lane.in_flight >= lane.capacity:
+            lane.rejected += 1
+            raise Rejected(503, "Server busy, please retry shortly.", self._retry_after(lane))
+        if self.max_per_user and self._per_user.get(user_id, 0) >= self.max_per_user:
+            lane.rejected += 1
+            raise Rejected(
+                429,
+                f"Too many uploads in progress (max {self.max_per_user} per user).",
+                self._retry_after(lane, lane.workers),
+            )
+        lane.in_flight += 1
+        self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+        return Ticket(lane_name, user_id)
+
+    def release(self, ticket: Ticket, completed: bool = False):
+        if ticket.released:
+            return
+        ticket.released = True
+        lane = self.lanes[ticket.lane]
+        lane.in_flight -= 1
+        if completed:
+            lane.avg_seconds = 0.8 * lane.avg_seconds + 0.2 * (time.monotonic() - ticket.admitted_at)
+        remaining = self._per_user.get(ticket.user_id, 1) - 1
+        if remaining > 0:
+            self._per_user[ticket.user_id] = remaining
+        else:
+            self._per_user.pop(ticket.user_id, None)
+
+    @staticmethod
+    def _retry_after(lane: Lane, ahead: Optional[int] = None) -> int:
+        # Time for the workers to drain what's ahead of this request
+        ahead = lane.in_flight - lane.capacity + 1 if ahead is None else ahead
+        per_slot = lane.avg_seconds / lane.workers
+        return int(min(120, max(1, math.ceil(per_slot * max(1, ahead)))))
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "in_flight": lane.in_flight,
+                "capacity": lane.capacity,
+                "rejected": lane.rejected,
+                "avg_seconds": round(lane.avg_seconds, 2),
+            }
+            for name, lane in self.lanes.items()
+        }
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware so rejection happens before the body is parsed."""
+
+    def __init__(self, app, controller: AdmissionController, routes: Dict[str, str], max_bytes: Dict[str, int]):
+        self.app = app
+        self.controller = controller
+        self.routes = routes          # path -> lane
+        self.max_bytes = max_bytes    # lane -> max request body size
+
+    async def __call__(self, scope, receive, send):
+        lane = self.routes.get(scope.get("path", "")) if scope["type"] == "http" else None
+        if lane is None or scope.get("method") != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes[lane]:
+            limit_mb = self.max_bytes[lane] // (1024 * 1024)
+            await _reject(send, Rejected(413, f"File too large. Maximum size is {limit_mb} MB."))
+            return
+
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        user_id = (query.get("user_id") or [""])[0]
+        if not user_id:
+            # Let the endpoint produce its usual 400
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            ticket = self.controller.admit(lane, user_id)
+        except Rejected as rejection:
+            await _reject(send, rejection)
+            return
+
+        scope.setdefault("state", {})["admission_ticket"] = ticket
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if not ticket.handed_off:
+                self.controller.release(ticket)
+
+
+async def _reject(send, rejection: Rejected):
+    body = json.dumps({"error": True, "status_code": rejection.status_code, "detail": rejection.detail}).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    if rejection.retry_after is not None:
+        headers.append((b"retry-after", str(rejection.retry_after).encode()))
+    await send({"type": "http.response.start", "status": rejection.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
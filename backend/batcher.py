@@ -0,0 +1,70 @@
+"""
+Micro-batching of concurrent requests.
+
+Callers `await batcher.submit(item)`; items arriving within `window` seconds
+of the first pending one (or until `max_batch` are pending) are handed to
+`run_batch(items)` together. run_batch returns one result per item, in
+order; an entry that is an Exception is raised to that item's caller only.
+If run_batch itself raises, every caller in the batch gets the error.
+"""
+
+from typing import Any, Awaitable, Callable, List, Optional
+import asyncio
+
+
+class MicroBatcher:
+    def __init__(self, run_batch: Callable[[List[Any]], Awaitable[List[Any]]], window: float, max_batch: int):
+        self.run_batch = run_batch
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._pending: List[tuple] = []   # (item, future)
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            # Keep a reference so the task isn't garbage-collected mid-flight
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[tuple]):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            outcomes = await self.run_batch([item for item, _ in batch])
+            if len(outcomes) != len(batch):
+                raise ValueError(f"run_batch returned {len(outcomes)} results for {len(batch)} items")
+        except Exception as exc:
+            outcomes = [exc] * len(batch)
+        for (_, future), outcome in zip(batch, outcomes):
+            if future.done():
+                continue   # caller went away
+            if isinstance(outcome, BaseException):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "pending": len(self._pending),
+        }
@@ -0,0 +1,299 @@
+"""
+Local stand-in for the parts of google.generativeai that main.py uses.
+
+Latencies, video PROCESSING time and error rates come from FakeConfig,
+normally built from FAKE_GEMINI_* environment variables (see
+FakeConfig.from_env). Replies are synthesized to match the response schema
+in the request, or taken from a recorded-responses JSON file:
+
+    {"skills": [<SkillExtractionResult>...], "jobs": [<JobMatchResult>...], ...}
+
+keyed by reply kind (skills, combined, jobs, batch_jobs, rerank) and picked
+at random. Distributions are written as "const:1.5", "uniform:0.5,2",
+"normal:1.0,0.2" or "lognormal:<median>,<sigma>" (seconds).
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+
+
+class Distribution:
+    def __init__(self, spec: str):
+        self.spec = spec
+        kind, _, args = spec.partition(":")
+        self.kind = kind
+        self.args = [float(a) for a in args.split(",") if a]
+        if kind not in ("const", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown distribution {spec!r}")
+
+    def sample(self, rng: random.Random) -> float:
+        a = self.args
+        if self.kind == "const":
+            value = a[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(a[0], a[1])
+        elif self.kind == "normal":
+            value = rng.gauss(a[0], a[1])
+        else:
+            value = rng.lognormvariate(math.log(a[0]), a[1])
+        return max(0.0, value)
+
+
+@dataclass
+class FakeConfig:
+    upload_latency: Distribution = field(default_factory=lambda: Distribution("lognormal:0.4,0.5"))
+    processing_time: Distribution = field(default_factory=lambda: Distribution("lognormal:4,0.4"))
+    generate_latency: Distribution = field(default_factory=lambda: Distribution("lognormal:3,0.5"))
+    text_latency: Distribution = field(default_factory=lambda: Distribution("lognormal:1.2,0.4"))
+    error_rate: float = 0.0        # share of generate calls that fail
+    error_codes: List[int] = field(default_factory=lambda: [429, 503, 500])
+    processing_failure_rate: float = 0.0
+    stream_chunks: int = 8
+    recorded: Dict[str, list] = field(default_factory=dict)
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "FakeConfig":
+        env = os.environ.get
+        config = cls()
+        for attr, var in (
+            ("upload_latency", "FAKE_GEMINI_UPLOAD_LATENCY"),
+            ("processing_time", "FAKE_GEMINI_PROCESSING_TIME"),
+            ("generate_latency", "FAKE_GEMINI_GENERATE_LATENCY"),
+            ("text_latency", "FAKE_GEMINI_TEXT_LATENCY"),
+        ):
+            if env(var):
+                setattr(config, attr, Distribution(env(var)))
+        config.error_rate = float(env("FAKE_GEMINI_ERROR_RATE", "0"))
+        if env("FAKE_GEMINI_ERROR_CODES"):
+            config.error_codes = [int(c) for c in env("FAKE_GEMINI_ERROR_CODES").split(",")]
+        config.processing_failure_rate = float(env("FAKE_GEMINI_PROCESSING_FAILURE_RATE", "0"))
+        if env("FAKE_GEMINI_RECORDED"):
+            with open(env("FAKE_GEMINI_RECORDED"), encoding="utf-8") as f:
+                config.recorded = json.load(f)
+        if env("FAKE_GEMINI_SEED"):
+            config.seed = int(env("FAKE_GEMINI_SEED"))
+        return config
+
+
+class FakeAPIError(Exception):
+    """Carries .code like google.api_core exceptions, so the governor classifies it."""
+
+    def __init__(self, code: int):
+        super().__init__(f"{code} fake Gemini error")
+        self.code = code
+
+
+# ── Canned replies ───────────────────────────────────────────────────────────
+
+SKILL_POOL = [
+    "Bricklaying", "Welding", "Plastering", "Tiling", "Electrical wiring", "Plumbing",
+    "Carpentry", "Painting", "Sewing", "Driving", "Cooking", "Customer service",
+    "Machine operation", "Quality inspection", "Teamwork", "Safety procedures",
+]
+JOB_POOL = [
+    ("Site Foreman", "৳25,000–30,000"), ("Welder", "৳20,000–35,000"),
+    ("Electrician", "৳18,000–30,000"), ("Sewing Machine Operator", "৳12,000–18,000"),
+    ("Driver", "৳15,000–25,000"), ("Cook", "৳14,000–22,000"),
+]
+
+
+def _reply_kind(schema: Optional[dict]) -> str:
+    props = (schema or {}).get("properties", {})
+    if "results" in props:
+        return "batch_jobs"
+    if "skill_details" in props:
+        return "combined" if "jobs" in props else "skills"
+    if "jobs" in props:
+        return "rerank" if "isco_code" in props["jobs"]["items"]["properties"] else "jobs"
+    return "skills"
+
+
+def _jobs(rng: random.Random) -> list:
+    return [
+        {"title": title, "match_score": rng.randint(55, 95), "salary_range": salary, "reason": "Demonstrated in the upload."}
+        for title, salary in rng.sample(JOB_POOL, 3)
+    ]
+
+
+def _synthesize(kind: str, prompt: str, rng: random.Random) -> dict:
+    if kind == "batch_jobs":
+        ids = re.findall(r"\[(c\d+)\]", prompt)
+        return {"results": [{"id": i, "jobs": _jobs(rng)} for i in ids]}
+    if kind == "rerank":
+        codes = re.findall(r"^(\d{4}): ", prompt, re.MULTILINE)
+        return {"jobs": [
+            {"isco_code": c, "match_score": rng.randint(55, 95), "reason": "Closest fit."} for c in codes[:3]
+        ]}
+    if kind == "jobs":
+        return {"jobs": _jobs(rng)}
+
+    skills = rng.sample(SKILL_POOL, rng.randint(2, 5))
+    data = {
+        "summary": f"The person demonstrates {', '.join(skills[:-1])} and {skills[-1]}.",
+        "detected_skills": skills,
+        "skill_details": [
+            {"name": s, "level": rng.randint(1, 3), "confidence": round(rng.uniform(0.6, 0.95), 2)} for s in skills
+        ],
+        "confidence_score": round(rng.uniform(0.6, 0.95), 2),
+        "language_detected": rng.choice(["Bangla", "English", "Mixed"]),
+        "raw_transcript": "আমি দশ বছর ধরে এই কাজ করছি।",
+    }
+    if kind == "combined":
+        data["jobs"] = _jobs(rng)
+    return data
+
+
+# ── Fake SDK surface ─────────────────────────────────────────────────────────
+
+class _State:
+    def __init__(self):
+        self.config = FakeConfig()
+        self.rng = random.Random()
+        self.lock = threading.Lock()
+        self.files: Dict[str, dict] = {}
+        self.ids = itertools.count(1)
+        self.calls = {"upload_file": 0, "get_file": 0, "generate": 0, "errors": 0}
+
+    def sample(self, dist: Distribution) -> float:
+        with self.lock:
+            return dist.sample(self.rng)
+
+    def chance(self, p: float) -> bool:
+        with self.lock:
+            return self.rng.random() < p
+
+
+_state = _State()
+
+
+def install(config: Optional[FakeConfig] = None):
+    """(Re)configure the fake; call before the first request."""
+    _state.config = config or FakeConfig.from_env()
+    _state.rng = random.Random(_state.config.seed)
+
+
+def stats() -> dict:
+    return dict(_state.calls, files=len(_state.files))
+
+
+def configure(api_key: str = "", **kwargs):
+    pass
+
+
+def _file_view(name: str) -> SimpleNamespace:
+    entry = _state.files.get(name)
+    if entry is None:
+        raise FakeAPIError(404)
+    state = entry["state"]
+    if state == "PROCESSING" and time.time() >= entry["ready_at"]:
+        state = entry["state"] = "FAILED" if entry["fails"] else "ACTIVE"
+    return SimpleNamespace(
+        name=name,
+        display_name=entry["display_name"],
+        mime_type=entry["mime_type"],
+        state=SimpleNamespace(name=state),
+        create_time=entry["create_time"],
+        expiration_time=entry["create_time"] + timedelta(hours=48),
+    )
+
+
+def upload_file(path: str, mime_type: str = None, display_name: str = None, **kwargs):
+    _state.calls["upload_file"] += 1
+    time.sleep(_state.sample(_state.config.upload_latency))
+    is_video = (mime_type or "").startswith("video/")
+    name = f"files/fake-{next(_state.ids)}"
+    _state.files[name] = {
+        "display_name": display_name,
+        "mime_type": mime_type,
+        "state": "PROCESSING" if is_video else "ACTIVE",
+        "ready_at": time.time() + (_state.sample(_state.config.processing_time) if is_video else 0),
+        "fails": is_video and _state.chance(_state.config.processing_failure_rate),
+        "create_time": datetime.now(timezone.utc),
+    }
+    return _file_view(name)
+
+
+def get_file(name: str):
+    _state.calls["get_file"] += 1
+    return _file_view(name)
+
+
+def delete_file(name: str):
+    _state.files.pop(getattr(name, "name", name), None)
+
+
+def list_files():
+    return [_file_view(name) for name in list(_state.files)]
+
+
+class _Response:
+    def __init__(self, text: str, chunks: int):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(total_token_count=len(text) // 3 + 800)
+        size = max(1, math.ceil(len(text) / max(1, chunks)))
+        self._chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        self._delay = 0.0
+
+    def __aiter__(self):
+        return self._stream()
+
+    async def _stream(self):
+        for chunk in self._chunks:
+            await asyncio.sleep(self._delay)
+            yield SimpleNamespace(text=chunk)
+
+
+class GenerativeModel:
+    def __init__(self, model_name: str = "", **kwargs):
+        self.model_name = model_name
+
+    def _reply(self, contents, generation_config) -> tuple:
+        parts = contents if isinstance(contents, list) else [contents]
+        prompt = "\n".join(p for p in parts if isinstance(p, str))
+        has_media = any(not isinstance(p, str) for p in parts)
+        kind = _reply_kind((generation_config or {}).get("response_schema"))
+        latency = _state.sample(_state.config.generate_latency if has_media else _state.config.text_latency)
+
+        recorded = _state.config.recorded.get(kind)
+        with _state.lock:
+            data = _state.rng.choice(recorded) if recorded else _synthesize(kind, prompt, _state.rng)
+        return latency, json.dumps(data, ensure_ascii=False)
+
+    async def generate_content_async(self, contents, generation_config=None, stream=False, **kwargs):
+        _state.calls["generate"] += 1
+        latency, text = self._reply(contents, generation_config)
+        if _state.chance(_state.config.error_rate):
+            await asyncio.sleep(latency * 0.2)
+            _state.calls["errors"] += 1
+            with _state.lock:
+                raise FakeAPIError(_state.rng.choice(_state.config.error_codes))
+
+        response = _Response(text, _state.config.stream_chunks)
+        if stream:
+            # Time to first chunk is ~1/4 of the latency; the rest is spread over the chunks
+            await asyncio.sleep(latency / 4)
+            response._delay = latency * 0.75 / max(1, len(response._chunks))
+        else:
+            await asyncio.sleep(latency)
+        return response
+
+    async def count_tokens_async(self, contents, **kwargs):
+        await asyncio.sleep(_state.sample(_state.config.text_latency) / 10)
+        return SimpleNamespace(total_tokens=len(str(contents)) // 3)
+
+    def generate_content(self, contents, generation_config=None, **kwargs):
+        latency, text = self._reply(contents, generation_config)
+        time.sleep(latency)
+        return _Response(text, 1)
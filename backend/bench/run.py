@@ -0,0 +1,372 @@
+"""
+Load-test the upload pipeline without spending Gemini quota.
+
+Starts the API (bench/server.py) with the fake Gemini module, then runs
+`--concurrency` simulated clients. Each client uploads an image or a video
+(picked by --mix), polls /processing-status until the upload is done and
+fetches /skills and /jobs. Reports p50/p95/p99 per endpoint and end to end,
+throughput and the server's peak RSS.
+
+    cd backend
+    pip install -r bench/requirements.txt
+    python -m bench.run --concurrency 16 --uploads 200 --json bench-$(git rev-parse --short HEAD).json
+    python -m bench.run ... --compare bench-<old commit>.json
+
+Runs with the same arguments and --seed are comparable across commits.
+Server settings (PIPELINE_*, JOB_MATCHER, ...) can be passed with --env.
+"""
+
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ── Results ──────────────────────────────────────────────────────────────────
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.outcomes: Dict[str, int] = {}
+
+    def record(self, name: str, seconds: float, status):
+        self.latencies.setdefault(name, []).append(seconds)
+        counts = self.statuses.setdefault(name, {})
+        counts[str(status)] = counts.get(str(status), 0) + 1
+
+    def outcome(self, name: str):
+        self.outcomes[name] = self.outcomes.get(name, 0) + 1
+
+
+def percentiles(values: List[float]) -> dict:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        cuts = [ordered[0]] * 99
+    else:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+    return {
+        "count": len(ordered),
+        "p50_ms": round(cuts[49] * 1000, 1),
+        "p95_ms": round(cuts[94] * 1000, 1),
+        "p99_ms": round(cuts[98] * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+# ── Payloads ─────────────────────────────────────────────────────────────────
+
+def _base_image() -> bytes:
+    try:
+        from PIL import Image
+    except ImportError:
+        return b"\xff\xd8\xff\xe0" + os.urandom(200_000) + b"\xff\xd9"
+    rng = random.Random(0)
+    img = Image.effect_noise((1280, 960), 64).convert("RGB")
+    img.paste((rng.randint(0, 255), 120, 80), (100, 100, 600, 500))
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+class Payloads:
+    def __init__(self, video_mb: float, unique: bool, seed: int):
+        self.image = _base_image()
+        self.video = b"\x00\x00\x00\x20ftypisom" + random.Random(seed).randbytes(int(video_mb * 1024 * 1024))
+        self.unique = unique
+
+    def get(self, kind: str) -> bytes:
+        body = self.image if kind == "image" else self.video
+        # Trailing bytes after the data make each upload hash differently, so
+        # the analysis cache doesn't turn the run into a cache benchmark
+        return body + os.urandom(16) if self.unique else body
+
+
+# ── Client ───────────────────────────────────────────────────────────────────
+
+async def timed(recorder: Recorder, name: str, request):
+    start = time.perf_counter()
+    try:
+        response = await request
+    except httpx.HTTPError as exc:
+        recorder.record(name, time.perf_counter() - start, type(exc).__name__)
+        return None
+    recorder.record(name, time.perf_counter() - start, response.status_code)
+    return response
+
+
+async def session(client: httpx.AsyncClient, recorder: Recorder, payloads: Payloads, kind: str, args, user_id: str):
+    start = time.perf_counter()
+    if kind == "image":
+        files = {"image": ("bench.jpg", payloads.get("image"), "image/jpeg")}
+        params = {"user_id": user_id}
+    else:
+        files = {"video": ("bench.mp4", payloads.get("video"), "video/mp4")}
+        params = {"user_id": user_id, **({"mode": args.video_mode} if args.video_mode else {})}
+
+    response = await timed(recorder, f"/upload-{kind}", client.post(f"/upload-{kind}", params=params, files=files))
+    if response is None or response.status_code != 200:
+        recorder.outcome(f"rejected_{response.status_code if response is not None else 'error'}")
+        return
+    processing_id = response.json()["processing_id"]
+
+    deadline = time.perf_counter() + args.timeout
+    status = None
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(args.poll_interval)
+        response = await timed(recorder, "/processing-status", client.get("/processing-status", params={"id": processing_id}))
+        if response is not None and response.status_code == 200:
+            status = response.json()["status"]
+            if status in ("done", "failed"):
+                break
+    if status != "done":
+        recorder.outcome(status or "timeout")
+        recorder.record(f"e2e_{kind}_{status or 'timeout'}", time.perf_counter() - start, status)
+        return
+
+    await timed(recorder, "/skills", client.get("/skills", params={"id": processing_id}))
+    await timed(recorder, "/jobs", client.get("/jobs", params={"id": processing_id}))
+    recorder.record(f"e2e_{kind}", time.perf_counter() - start, "done")
+    recorder.outcome("done")
+
+
+async def drive(args, recorder: Recorder) -> float:
+    payloads = Payloads(args.video_mb, not args.reuse_media, args.seed)
+    rng = random.Random(args.seed)
+    kinds, weights = zip(*args.mix.items())
+    plan = [rng.choices(kinds, weights)[0] for _ in range(args.uploads)]
+    # Spread the uploads over this many users so the per-user in-flight cap rarely bites
+    users = [f"bench-user-{i}" for i in range(max(args.concurrency, 1) * 4)]
+    next_index = iter(range(len(plan)))
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        async def worker():
+            for i in next_index:
+                await session(client, recorder, payloads, plan[i], args, users[i % len(users)])
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        return time.perf_counter() - start
+
+
+# ── Server process ───────────────────────────────────────────────────────────
+
+def _proc_status_kb(pid: int, field: str) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+class RSSSampler:
+    """Peak RSS of a process: VmHWM on Linux, else the highest VmRSS sampled."""
+
+    def __init__(self, pid: Optional[int]):
+        self.pid = pid
+        self.peak_kb = 0
+        self._task = None
+
+    async def _sample(self):
+        while True:
+            self.peak_kb = max(self.peak_kb, _proc_status_kb(self.pid, "VmRSS") or 0)
+            await asyncio.sleep(0.25)
+
+    def start(self):
+        if self.pid:
+            self._task = asyncio.create_task(self._sample())
+
+    def stop(self) -> Optional[float]:
+        if self._task:
+            self._task.cancel()
+        if not self.pid:
+            return None
+        peak = max(self.peak_kb, _proc_status_kb(self.pid, "VmHWM") or 0)
+        return round(peak / 1024, 1) if peak else None
+
+
+def start_server(args) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update(args.env)
+    for flag, var in (
+        ("upload_latency", "FAKE_GEMINI_UPLOAD_LATENCY"),
+        ("processing_time", "FAKE_GEMINI_PROCESSING_TIME"),
+        ("generate_latency", "FAKE_GEMINI_GENERATE_LATENCY"),
+        ("text_latency", "FAKE_GEMINI_TEXT_LATENCY"),
+        ("error_rate", "FAKE_GEMINI_ERROR_RATE"),
+        ("recorded", "FAKE_GEMINI_RECORDED"),
+    ):
+        value = getattr(args, flag)
+        if value is not None:
+            env[var] = str(value)
+    env["FAKE_GEMINI_SEED"] = str(args.seed)
+    return subprocess.Popen(
+        [sys.executable, "-m", "bench.server", "--port", str(args.port)],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+async def wait_ready(url: str, timeout: float = 30):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=url) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+
+async def fetch_health(url: str) -> dict:
+    try:
+        async with httpx.AsyncClient(base_url=url) as client:
+            return (await client.get("/health")).json()
+    except (httpx.HTTPError, ValueError):
+        return {}
+
+
+# ── Report ───────────────────────────────────────────────────────────────────
+
+def git_revision() -> dict:
+    def git(*cmd):
+        try:
+            return subprocess.run(["git", *cmd], cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--", "."))}
+
+
+def build_report(args, recorder: Recorder, elapsed: float, peak_rss_mb: Optional[float], health: dict) -> dict:
+    requests = sum(len(v) for k, v in recorder.latencies.items() if not k.startswith("e2e"))
+    return {
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "params": {
+            k: v for k, v in vars(args).items() if k not in ("json", "compare", "url")
+        },
+        "elapsed_s": round(elapsed, 2),
+        "uploads_per_s": round(recorder.outcomes.get("done", 0) / elapsed, 2) if elapsed else 0,
+        "requests_per_s": round(requests / elapsed, 2) if elapsed else 0,
+        "peak_rss_mb": peak_rss_mb,
+        "outcomes": recorder.outcomes,
+        "latency": {name: percentiles(values) for name, values in sorted(recorder.latencies.items())},
+        "status_codes": recorder.statuses,
+        "server": {k: health.get(k) for k in ("analysis_cache", "job_match_cache", "gemini_governor", "admission")},
+    }
+
+
+def print_report(report: dict, baseline: Optional[dict]):
+    git = report["git"]
+    print(f"\ncommit {git['commit']}{' (dirty)' if git['dirty'] else ''}  elapsed {report['elapsed_s']}s")
+    print(f"{'endpoint':<24}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, stats in report["latency"].items():
+        line = f"{name:<24}{stats['count']:>7}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['max_ms']:>10}"
+        old = (baseline or {}).get("latency", {}).get(name)
+        if old and old.get("p95_ms"):
+            line += f"   p95 {(stats['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100:+.1f}%"
+        print(line)
+
+    def delta(key):
+        old = (baseline or {}).get(key)
+        return f" ({(report[key] - old) / old * 100:+.1f}%)" if old and report[key] is not None else ""
+
+    print(f"uploads/s {report['uploads_per_s']}{delta('uploads_per_s')}   "
+          f"requests/s {report['requests_per_s']}{delta('requests_per_s')}   "
+          f"peak RSS {report['peak_rss_mb']} MB{delta('peak_rss_mb')}")
+    print(f"outcomes {report['outcomes']}")
+    if baseline:
+        print(f"compared with commit {baseline.get('git', {}).get('commit')}")
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16, help="simultaneous clients")
+    parser.add_argument("--uploads", type=int, default=200, help="total uploads to run")
+    parser.add_argument("--mix", default="image=3,video=1", help="relative weights of image/video uploads")
+    parser.add_argument("--video-mb", type=float, default=2.0)
+    parser.add_argument("--video-mode", default=None, help="?mode= for /upload-video")
+    parser.add_argument("--reuse-media", action="store_true", help="send identical bytes (exercises caches)")
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", default=None, help="benchmark a server that's already running instead")
+    parser.add_argument("--pid", type=int, default=None, help="PID of that server, for peak RSS")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="server environment")
+    fake = parser.add_argument_group("fake Gemini (distributions like lognormal:3,0.5 or uniform:1,2)")
+    fake.add_argument("--upload-latency")
+    fake.add_argument("--processing-time")
+    fake.add_argument("--generate-latency")
+    fake.add_argument("--text-latency")
+    fake.add_argument("--error-rate", type=float)
+    fake.add_argument("--recorded", help="JSON file of recorded replies by kind")
+    parser.add_argument("--json", help="write the report here")
+    parser.add_argument("--compare", help="earlier report to diff against")
+    args = parser.parse_args(argv)
+
+    args.mix = {k: float(v) for k, v in (part.split("=") for part in args.mix.split(","))}
+    args.env = dict(item.split("=", 1) for item in args.env)
+    return args
+
+
+async def amain(args) -> dict:
+    server = None
+    pid = args.pid
+    if args.url is None:
+        args.url = f"http://127.0.0.1:{args.port}"
+        server = start_server(args)
+        pid = server.pid
+    try:
+        await wait_ready(args.url)
+        recorder = Recorder()
+        rss = RSSSampler(pid)
+        rss.start()
+        elapsed = await drive(args, recorder)
+        peak = rss.stop()
+        health = await fetch_health(args.url)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+    return build_report(args, recorder, elapsed, peak, health)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    report = asyncio.run(amain(args))
+    print_report(report, baseline)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Run the Praxis API against the fake Gemini module (bench/fake_genai.py).
+
+    python -m bench.server --port 8765
+
+Started by bench.run; the fake is configured from FAKE_GEMINI_* variables.
+"""
+
+import argparse
+import os
+
+import uvicorn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    # main.py reads the key at import time; any non-empty value enables the Gemini path
+    os.environ["GEMINI_API_KEY"] = os.environ.get("BENCH_GEMINI_API_KEY", "bench-fake-key")
+
+    from bench import fake_genai
+    import main as app_module
+
+    fake_genai.install()
+    app_module.genai = fake_genai
+    uvicorn.run(app_module.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Measure API cold start: how long `import main` takes in a fresh interpreter.
+
+    cd backend
+    python -m bench.startup --runs 10
+
+Variants, each in its own process so nothing is cached between them:
+
+- lazy   `import main` as shipped; the Gemini SDK loads on first use
+- eager  google.generativeai imported before main, i.e. the old behaviour
+         of importing it at module load
+
+For lazy, "first_use" is the one-off cost of loading the SDK and building
+the model later (what GEMINI_WARMUP moves to startup). No network calls are
+made, so the numbers exclude the connection that warm-up also opens.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, os, sys, time
+start = time.perf_counter()
+if sys.argv[1] == "eager":
+    import google.generativeai
+import main
+imported = time.perf_counter()
+main._model()
+print(json.dumps({"import": imported - start, "first_use": time.perf_counter() - imported}))
+"""
+
+
+def run_probe(variant: str) -> dict:
+    env = dict(os.environ, GEMINI_API_KEY=os.environ.get("GEMINI_API_KEY", "startup-probe"), GEMINI_WARMUP="false")
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, variant],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", help="write the results here")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for variant in ("lazy", "eager"):
+        run_probe(variant)   # discarded: warms the page cache
+        samples = [run_probe(variant) for _ in range(args.runs)]
+        results[variant] = {
+            key: {
+                "median_ms": round(statistics.median(s[key] for s in samples) * 1000, 1),
+                "min_ms": round(min(s[key] for s in samples) * 1000, 1),
+            }
+            for key in ("import", "first_use")
+        }
+
+    print(f"{'variant':<8} {'import median':>14} {'import min':>11} {'first use':>10}")
+    for variant, r in results.items():
+        first_use = f"{r['first_use']['median_ms']:.0f} ms" if variant == "lazy" else "-"
+        print(f"{variant:<8} {r['import']['median_ms']:>11.0f} ms {r['import']['min_ms']:>8.0f} ms {first_use:>10}")
+    saved = results["eager"]["import"]["median_ms"] - results["lazy"]["import"]["median_ms"]
+    print(f"\nlazy import saves {saved:.0f} ms of cold start (median of {args.runs} runs)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"runs": args.runs, "python": sys.version.split()[0], "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
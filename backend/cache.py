@@ -0,0 +1,140 @@
+"""
+Small LRU + TTL cache with an optional on-disk tier.
+
+Values must be JSON-serialisable. The memory tier is only touched from the
+event loop; disk reads/writes are pushed to a worker thread.
+get_or_compute() adds single-flight: concurrent misses on one key share a
+single computation.
+"""
+
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+
+class TTLCache:
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 86400, disk_dir: str = ""):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0   # misses that waited on another caller's computation
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()   # key -> (expires_at, value)
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # ── memory tier ──────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, expires_at: Optional[float] = None):
+        self._entries[key] = (expires_at or time.time() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ── disk tier ────────────────────────────────────────────────────────────
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if entry.get("expires_at", 0) < time.time():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            return None
+        return entry["expires_at"], entry["value"]
+
+    def _disk_set(self, key: str, value: Any, expires_at: float):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "expires_at": expires_at, "value": value}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    # ── public async API (both tiers, counts hits/misses) ────────────────────
+
+    async def aget(self, key: str) -> Optional[Any]:
+        value = self.get(key)
+        if value is None and self.disk_dir:
+            entry = await asyncio.to_thread(self._disk_get, key)
+            if entry is not None:
+                expires_at, value = entry
+                self.set(key, value, expires_at)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def aset(self, key: str, value: Any, expires_at: Optional[float] = None):
+        expires_at = expires_at or time.time() + self.ttl_seconds
+        self.set(key, value, expires_at)
+        if self.disk_dir:
+            await asyncio.to_thread(self._disk_set, key, value, expires_at)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Cached value for key, else the result of compute(), which is then cached.
+
+        While one caller computes a key, others asking for it wait for that
+        result instead of computing it again. Errors are not cached.
+        """
+        value = await self.aget(key)
+        if value is not None:
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting; don't warn about an unretrieved exception
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            value = await compute()
+            await self.aset(key, value)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            del self._inflight[key]
+        future.set_result(value)
+        return value
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,36 @@
+"""
+In-process pub/sub for processing stage changes.
+
+The pipeline publishes every stage transition for a processing ID; each
+/processing-events connection subscribes with its own queue. Subscribers
+on a different worker process won't see these events, so the SSE handler
+also re-reads the result store when its queue stays quiet.
+"""
+
+from typing import Dict, Set
+import asyncio
+
+
+class StatusBroker:
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, processing_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(processing_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, processing_id: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(processing_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[processing_id]
+
+    def publish(self, processing_id: str, event: dict):
+        for queue in self._subscribers.get(processing_id, ()):
+            queue.put_nowait(event)
+
+    def subscriber_count(self) -> int:
+        return sum(len(s) for s in self._subscribers.values())
@@ -0,0 +1,74 @@
+"""
+Registry of media already uploaded to the Gemini Files API, keyed by content hash.
+
+Gemini keeps uploaded files for ~48 hours. Reusing an ACTIVE file lets a
+retry skip both the upload and the video PROCESSING wait. The registry only
+tracks state; the SDK calls live in main.py.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import time
+
+# Display-name prefix for files we upload, so the sweeper can recognise them
+DISPLAY_NAME_PREFIX = "praxis-"
+
+# Don't hand out a file that expires within this many seconds
+EXPIRY_MARGIN = 15 * 60
+
+
+class GeminiFileRegistry:
+    def __init__(self, reuse_ttl: float):
+        # How long an unused file is kept before the sweeper deletes it
+        self.reuse_ttl = reuse_ttl
+        self._files: Dict[str, dict] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def lock(self, sha256: str) -> asyncio.Lock:
+        """Per-hash lock so concurrent uploads of the same media upload once."""
+        if sha256 not in self._locks:
+            self._locks[sha256] = asyncio.Lock()
+        return self._locks[sha256]
+
+    def lookup(self, sha256: str) -> Optional[str]:
+        """Return the remote file name if an ACTIVE copy is still usable."""
+        entry = self._files.get(sha256)
+        if not entry or entry["state"] != "ACTIVE":
+            return None
+        if entry["expires_at"] - EXPIRY_MARGIN < time.time():
+            return None
+        entry["last_used"] = time.time()
+        return entry["name"]
+
+    def record(self, sha256: str, name: str, state: str, expires_at: float):
+        self._files[sha256] = {
+            "name": name,
+            "state": state,
+            "expires_at": expires_at,
+            "last_used": time.time(),
+        }
+
+    def forget(self, sha256: str):
+        self._files.pop(sha256, None)
+
+    def names(self) -> set:
+        return {entry["name"] for entry in self._files.values()}
+
+    def stale(self) -> List[Tuple[str, str]]:
+        """(sha256, name) pairs that are expiring, failed, or idle past reuse_ttl."""
+        now = time.time()
+        return [
+            (sha256, entry["name"])
+            for sha256, entry in self._files.items()
+            if entry["state"] != "ACTIVE"
+            or entry["expires_at"] - EXPIRY_MARGIN < now
+            or entry["last_used"] + self.reuse_ttl < now
+        ]
+
+    def prune_locks(self):
+        for sha256 in list(self._locks):
+            if sha256 not in self._files and not self._locks[sha256].locked():
+                del self._locks[sha256]
+
+    def __len__(self):
+        return len(self._files)
@@ -0,0 +1,222 @@
+"""
+Client-side quota governor for Gemini calls.
+
+Every rate-limited call goes through GeminiGovernor.run(), which:
+
+- waits for a request-per-minute and a token-per-minute token bucket,
+- holds one of an AIMD-managed number of concurrency slots (the limit grows
+  by ~1 per round of successes and halves on a 429/5xx),
+- retries transient failures with full-jitter exponential backoff,
+  honouring a server-provided Retry-After.
+
+Token usage is estimated up front and reconciled against the real count
+once the response is in.
+"""
+
+from typing import Awaitable, Callable, Optional, TypeVar
+import asyncio
+import random
+import time
+
+T = TypeVar("T")
+
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """`rate_per_minute` units per minute, bursting up to one minute's worth. 0 = unlimited."""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = rate_per_minute
+        self.tokens = rate_per_minute
+        self._refill_per_sec = rate_per_minute / 60.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self._refill_per_sec)
+        self._updated = now
+
+    async def take(self, amount: float = 1.0):
+        if not self.capacity:
+            return
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self._refill_per_sec)
+
+    def debit(self, amount: float):
+        """Charge (or refund, if negative) usage after the fact; may go below zero."""
+        if self.capacity:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+def status_code(exc: BaseException) -> Optional[int]:
+    code = getattr(exc, "code", None)
+    code = code() if callable(code) else code
+    try:
+        return int(code)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    return status_code(exc) in TRANSIENT_STATUS_CODES
+
+
+def error_class(exc: BaseException) -> str:
+    """Coarse, low-cardinality label for a failed call (for metrics)."""
+    code = status_code(exc)
+    if code == 429:
+        return "rate_limited"
+    if code is not None and code >= 500:
+        return "server_error"
+    if code is not None and code >= 400:
+        return "client_error"
+    if isinstance(exc, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(exc, ConnectionError):
+        return "connection"
+    return "other"
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait, if the error carries that hint."""
+    value = getattr(exc, "retry_after", None)
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if value is None and headers is not None:
+        value = headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class GeminiGovernor:
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_retries: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max(min_concurrency, max_concurrency // 2))
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_error = on_error   # called with every failed attempt, retried or not
+
+        self.in_flight = 0
+        self.retries = 0
+        self.throttled = 0
+        self._cond = asyncio.Condition()
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+
+    # ── concurrency (AIMD) ───────────────────────────────────────────────────
+
+    async def _acquire_slot(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def _release_slot(self):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def _on_success(self):
+        self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+
+    def _on_throttle(self, pause: Optional[float]):
+        self.throttled += 1
+        now = time.monotonic()
+        # One burst of 429s should only halve the limit once
+        if now - self._last_decrease > 1.0:
+            self.limit = max(self.min_concurrency, self.limit / 2)
+            self._last_decrease = now
+        if pause:
+            self._blocked_until = max(self._blocked_until, now + pause)
+
+    # ── public API ───────────────────────────────────────────────────────────
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        *,
+        tokens: float = 0,
+        tokens_used: Optional[Callable[[T], Optional[float]]] = None,
+        rate_limited: bool = True,
+    ) -> T:
+        """Run `call` under the governor, retrying transient failures.
+
+        `tokens` is the up-front estimate charged to the TPM bucket;
+        `tokens_used(result)` returns the real count to reconcile with.
+        Calls with rate_limited=False (e.g. Files API) are only retried.
+        """
+        for attempt in range(self.max_retries + 1):
+            wait = self._blocked_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            if rate_limited:
+                await self.requests.take(1)
+                await self.tokens.take(tokens)
+                await self._acquire_slot()
+            failure: Optional[Exception] = None
+            try:
+                result = await call()
+            except Exception as exc:
+                if self.on_error is not None:
+                    self.on_error(exc)
+                if not is_transient(exc) or attempt == self.max_retries:
+                    raise
+                failure = exc
+            finally:
+                if rate_limited:
+                    await self._release_slot()
+
+            if failure is not None:
+                # Back off without holding a slot, so the AIMD limit still governs other calls
+                hint = retry_after(failure)
+                if status_code(failure) == 429 or hint is not None:
+                    self._on_throttle(hint)
+                elif rate_limited:
+                    self._on_throttle(None)
+                self.retries += 1
+                delay = hint if hint is not None else random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                await asyncio.sleep(delay)
+                continue
+
+            if rate_limited:
+                self._on_success()
+                if tokens_used is not None:
+                    used = tokens_used(result)
+                    if used is not None:
+                        self.tokens.debit(used - tokens)
+            return result
+
+    def stats(self) -> dict:
+        return {
+            "concurrency_limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "retries": self.retries,
+            "throttled": self.throttled,
+        }
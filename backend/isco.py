@@ -0,0 +1,209 @@
+"""
+Local ISCO-08 job matcher and skill canonicalizer.
+
+Loads the occupation catalog in data/isco08_occupations.json and indexes
+each occupation's skill keywords (Bangla and English) as TF-IDF weighted,
+hashed character n-gram vectors. Ranking a skill list is one matrix-vector
+product, so matching needs no network call.
+
+data/isco08_skills.json lists canonical skills (ID = ISCO-08 unit group +
+slug) with Bangla, English and transliterated synonyms. Raw skill names are
+resolved by exact synonym lookup first, then by n-gram similarity. Only
+exact hits are safe to merge on: n-gram similarity also scores unrelated
+words that share letters ("Printing" vs "Painting") highly, so a fuzzy
+hit is only accepted with a very high score and a clear lead, or when the
+raw name contains all the words of a synonym ("Plumbing repair").
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+import json
+import os
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+CATALOG_PATH = os.path.join(DATA_DIR, "isco08_occupations.json")
+SKILLS_PATH = os.path.join(DATA_DIR, "isco08_skills.json")
+
+NGRAM_SIZES = (2, 3, 4)
+VECTOR_DIM = 1 << 12
+
+# Fuzzy skill matches: a synonym whose words all appear in the name needs
+# SKILL_MATCH_THRESHOLD; otherwise the score must reach SKILL_MATCH_STRONG and
+# beat the best other skill by SKILL_MATCH_MARGIN
+SKILL_MATCH_THRESHOLD = 0.55
+SKILL_MATCH_STRONG = 0.8
+SKILL_MATCH_MARGIN = 0.2
+
+_STRIP_RE = re.compile(r"[\s\-_/.,;:()'\"]+")
+
+
+def normalize(text: str) -> str:
+    """Case-fold and drop whitespace/punctuation, so 'Brick laying' == 'bricklaying'."""
+    return _STRIP_RE.sub("", unicodedata.normalize("NFC", text).casefold())
+
+
+def _words(text: str) -> frozenset:
+    return frozenset(w for w in _STRIP_RE.split(unicodedata.normalize("NFC", text).casefold()) if w)
+
+
+def _ngram_counts(text: str) -> Dict[int, float]:
+    padded = f"^{normalize(text)}$"
+    counts: Dict[int, float] = {}
+    for n in NGRAM_SIZES:
+        for i in range(len(padded) - n + 1):
+            bucket = zlib.crc32(padded[i:i + n].encode("utf-8")) & (VECTOR_DIM - 1)
+            counts[bucket] = counts.get(bucket, 0.0) + 1.0
+    return counts
+
+
+@lru_cache(maxsize=4096)
+def _hashed_vector(text: str) -> np.ndarray:
+    """Unit-length hashed n-gram count vector (shared; do not mutate)."""
+    vec = np.zeros(VECTOR_DIM, dtype=np.float32)
+    counts = _ngram_counts(text)
+    if counts:
+        vec[list(counts)] = list(counts.values())
+        vec /= np.linalg.norm(vec)
+    return vec
+
+
+class OccupationIndex:
+    def __init__(self, occupations: List[dict]):
+        self.occupations = occupations
+
+        raw = np.zeros((len(occupations), VECTOR_DIM), dtype=np.float32)
+        for row, occ in enumerate(occupations):
+            for keyword in occ["skills"] + [occ["title_en"], occ["title_bn"]]:
+                raw[row] += _hashed_vector(keyword)
+
+        doc_freq = np.count_nonzero(raw, axis=0)
+        self.idf = (np.log((1 + len(occupations)) / (1 + doc_freq)) + 1).astype(np.float32)
+        self.matrix = self._l2(raw * self.idf)
+
+    @classmethod
+    def load(cls, path: str = CATALOG_PATH) -> "OccupationIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def _l2(m: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(m, axis=-1, keepdims=True)
+        return m / np.where(norms == 0, 1, norms)
+
+    def vectorize(self, text: str) -> np.ndarray:
+        return self._l2(_hashed_vector(text) * self.idf)
+
+    def rank(self, skills: Sequence[Tuple[str, float]], top_k: int = 3) -> List[dict]:
+        """Rank occupations for (skill_name, weight) pairs.
+
+        Returns the top_k catalog entries, each with a cosine `score` in
+        [0, 1] and `matched_skills` (the input skills that support it).
+        """
+        if not skills:
+            return []
+
+        skill_vecs = np.stack([self.vectorize(name) for name, _ in skills])
+        weights = np.array([w for _, w in skills], dtype=np.float32)
+        query = self._l2(weights @ skill_vecs)
+
+        scores = self.matrix @ query
+        top = np.argsort(-scores)[:top_k]
+
+        # Per-skill similarity against the winners, to explain each match
+        per_skill = skill_vecs @ self.matrix[top].T
+        results = []
+        for col, row in enumerate(top):
+            floor = max(0.08, 0.5 * float(per_skill[:, col].max()))
+            matched = [
+                skills[i][0]
+                for i in np.argsort(-per_skill[:, col])
+                if per_skill[i, col] >= floor
+            ]
+            results.append({
+                **self.occupations[row],
+                "score": float(max(0.0, scores[row])),
+                "matched_skills": matched[:3],
+            })
+        return results
+
+
+class SkillIndex:
+    def __init__(self, skills: List[dict]):
+        self.skills = {s["skill_id"]: s for s in skills}
+        self._exact: Dict[str, str] = {}
+        terms: List[str] = []
+        self._owners: List[str] = []
+        self._term_words: List[frozenset] = []
+        for s in skills:
+            for term in [s["name_en"], s["name_bn"], *s["synonyms"]]:
+                self._exact.setdefault(normalize(term), s["skill_id"])
+                terms.append(term)
+                self._owners.append(s["skill_id"])
+                self._term_words.append(_words(term))
+        self.matrix = np.stack([_hashed_vector(t) for t in terms])
+
+    @classmethod
+    def load(cls, path: str = SKILLS_PATH) -> "SkillIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def canonicalize(self, name: str) -> Optional[dict]:
+        """Return the canonical skill entry for a raw name, or None if nothing is close.
+
+        The entry carries "match": "exact" for a synonym hit or "fuzzy" otherwise.
+        """
+        skill_id = self._exact.get(normalize(name))
+        if skill_id is not None:
+            return {**self.skills[skill_id], "match": "exact"}
+        skill_id = self._fuzzy(name)
+        return {**self.skills[skill_id], "match": "fuzzy"} if skill_id else None
+
+    def _fuzzy(self, name: str) -> Optional[str]:
+        sims = self.matrix @ _hashed_vector(name)
+        order = np.argsort(-sims)
+        words = _words(name)
+        for i in order:
+            if sims[i] < SKILL_MATCH_THRESHOLD:
+                break
+            if self._term_words[i] <= words:
+                return self._owners[i]
+
+        best = int(order[0])
+        runner_up = next((float(sims[i]) for i in order if self._owners[i] != self._owners[best]), 0.0)
+        if sims[best] >= SKILL_MATCH_STRONG and sims[best] - runner_up >= SKILL_MATCH_MARGIN:
+            return self._owners[best]
+        return None
+
+
+_index: Optional[OccupationIndex] = None
+_skill_index: Optional[SkillIndex] = None
+
+
+def get_index() -> OccupationIndex:
+    """Load and index the catalog once per process."""
+    global _index
+    if _index is None:
+        _index = OccupationIndex.load()
+    return _index
+
+
+def get_skill_index() -> SkillIndex:
+    global _skill_index
+    if _skill_index is None:
+        _skill_index = SkillIndex.load()
+    return _skill_index
+
+
+def skill_key(name: str, skill_id: Optional[str] = None, match: Optional[str] = None) -> str:
+    """What skills merge on: the canonical ID for exact synonym hits, else the normalized name."""
+    return skill_id if skill_id and match != "fuzzy" else normalize(name)
+
+
+@lru_cache(maxsize=8192)
+def canonicalize_skill(name: str) -> Optional[dict]:
+    return get_skill_index().canonicalize(name)
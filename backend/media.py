@@ -0,0 +1,244 @@
+"""
+Local media preprocessing before upload to Gemini.
+
+These functions are CPU-bound and run in a process pool (see main.py), so
+they take file paths and return paths or small byte payloads.
+
+Keyframe sampling needs PyAV (`pip install av`); without it
+keyframes_available() is False and callers send the full video instead.
+"""
+
+from typing import List, Optional, Tuple
+import io
+import os
+import tempfile
+import wave
+
+import numpy as np
+from PIL import Image, ImageOps
+
+try:
+    import av
+except ImportError:   # optional: only needed for keyframe mode
+    av = None
+
+IMAGE_FORMATS = {
+    "webp": ("WEBP", "image/webp", ".webp"),
+    "jpeg": ("JPEG", "image/jpeg", ".jpg"),
+}
+
+
+def preprocess_image(path: str, max_edge: int, fmt: str = "webp", quality: int = 85):
+    """Fix EXIF orientation, downsize to max_edge, strip metadata and recompress.
+
+    Returns (out_path, mime_type, bytes_in, bytes_out). If the re-encoded file
+    isn't smaller, out_path is None and the original should be used.
+    """
+    pil_format, mime_type, suffix = IMAGE_FORMATS[fmt]
+    bytes_in = os.path.getsize(path)
+
+    with Image.open(path) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        if pil_format == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        elif img.mode not in ("RGB", "RGBA", "L"):
+            img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+
+        fd, out_path = tempfile.mkstemp(suffix=suffix, prefix="praxis-pre-")
+        os.close(fd)
+        # No exif=/icc_profile= arguments, so metadata is dropped
+        img.save(out_path, pil_format, quality=quality, optimize=True)
+
+    bytes_out = os.path.getsize(out_path)
+    if bytes_out >= bytes_in:
+        os.unlink(out_path)
+        return None, None, bytes_in, bytes_in
+    return out_path, mime_type, bytes_in, bytes_out
+
+
+# ── Keyframe sampling ────────────────────────────────────────────────────────
+
+AUDIO_SAMPLE_RATE = 16000
+
+
+def keyframes_available() -> bool:
+    return av is not None
+
+
+def _frame_signature(img: Image.Image) -> np.ndarray:
+    """Normalized 32-bin grayscale histogram of a small thumbnail."""
+    small = img.convert("L").resize((64, 36))
+    hist = np.asarray(small.histogram(), dtype=np.float32).reshape(32, 8).sum(axis=1)
+    return hist / hist.sum()
+
+
+def _to_jpeg(img: Image.Image, max_edge: int) -> bytes:
+    img = img.copy()
+    img.thumbnail((max_edge, max_edge))
+    buf = io.BytesIO()
+    img.convert("RGB").save(buf, "JPEG", quality=80)
+    return buf.getvalue()
+
+
+def _sample_frames(path: str, max_frames: int, max_edge: int, keyframes_only: bool) -> Tuple[list, float]:
+    """Decode video frames and score each sample by how much it differs from the previous one.
+
+    Returns ([(t, change_score, jpeg_bytes)], duration).
+    """
+    candidates = []
+    with av.open(path) as container:
+        stream = container.streams.video[0]
+        if stream.duration is not None and stream.time_base is not None:
+            duration = float(stream.duration * stream.time_base)
+        elif container.duration is not None:
+            duration = container.duration / av.time_base
+        else:
+            duration = 0.0
+
+        if keyframes_only:
+            stream.codec_context.skip_frame = "NONKEY"
+            interval = 0.0
+        else:
+            # ~4 candidates per frame in the budget; 1/s when length is unknown
+            interval = max(0.5, duration / (max_frames * 4)) if duration else 1.0
+
+        previous = None
+        next_t = 0.0
+        for frame in container.decode(stream):
+            if frame.time is None or frame.time < next_t:
+                continue
+            next_t = frame.time + interval
+            img = frame.to_image()
+            signature = _frame_signature(img)
+            score = 2.0 if previous is None else float(np.abs(signature - previous).sum())
+            previous = signature
+            candidates.append((frame.time, score, _to_jpeg(img, max_edge)))
+            duration = max(duration, frame.time)
+    return candidates, duration
+
+
+def _loudest_audio(path: str, seconds: float) -> Optional[Tuple[float, bytes]]:
+    """The `seconds`-long window with the most speech energy, as 16 kHz mono WAV."""
+    with av.open(path) as container:
+        if not container.streams.audio:
+            return None
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=AUDIO_SAMPLE_RATE)
+        chunks = []
+        for frame in container.decode(container.streams.audio[0]):
+            for out in resampler.resample(frame):
+                chunks.append(out.to_ndarray().reshape(-1))
+    if not chunks:
+        return None
+    samples = np.concatenate(chunks)
+
+    window = int(seconds * AUDIO_SAMPLE_RATE)
+    start = 0
+    if len(samples) > window:
+        # Energy per second, then the best run of `seconds` seconds
+        per_sec = samples[: len(samples) // AUDIO_SAMPLE_RATE * AUDIO_SAMPLE_RATE].astype(np.float32)
+        energy = (per_sec.reshape(-1, AUDIO_SAMPLE_RATE) ** 2).mean(axis=1)
+        span = max(1, int(seconds))
+        if len(energy) > span:
+            best = int(np.argmax(np.convolve(energy, np.ones(span), mode="valid")))
+            start = best * AUDIO_SAMPLE_RATE
+    excerpt = samples[start:start + window]
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(AUDIO_SAMPLE_RATE)
+        wav.writeframes(excerpt.astype(np.int16).tobytes())
+    return start / AUDIO_SAMPLE_RATE, buf.getvalue()
+
+
+def sample_keyframes(path: str, max_frames: int, audio_seconds: float, max_edge: int = 768) -> dict:
+    """Build a compact stand-in for a video: scene-change keyframes plus an audio excerpt.
+
+    Tries the stream's own keyframes first (cheap to decode) and falls back
+    to sampling decoded frames when the encoder wrote too few of them.
+    Returns {"duration", "frames": [(t, jpeg_bytes)], "audio": (start, wav_bytes) | None}.
+    """
+    candidates, duration = _sample_frames(path, max_frames, max_edge, keyframes_only=True)
+    if len(candidates) < max_frames:
+        candidates, duration = _sample_frames(path, max_frames, max_edge, keyframes_only=False)
+
+    # Always keep the opening frame, then the biggest scene changes, in time order
+    chosen: List[tuple] = sorted(candidates, key=lambda c: c[1], reverse=True)[:max_frames]
+    frames = [(t, jpeg) for t, _, jpeg in sorted(chosen, key=lambda c: c[0])]
+
+    audio = _loudest_audio(path, audio_seconds) if audio_seconds > 0 else None
+    return {"duration": duration, "frames": frames, "audio": audio}
+
+
+# ── Segment splitting ────────────────────────────────────────────────────────
+
+def _copy_stream(output, stream):
+    # PyAV 14 renamed add_stream(template=) to add_stream_from_template()
+    if hasattr(output, "add_stream_from_template"):
+        return output.add_stream_from_template(stream)
+    return output.add_stream(template=stream)
+
+
+def split_video(path: str, segment_seconds: float, max_segments: int) -> List[Tuple[float, float, str]]:
+    """Cut a video into ~segment_seconds pieces without re-encoding.
+
+    Cuts happen at the first video keyframe past each boundary, so pieces
+    decode on their own. The segment length grows if the video would
+    otherwise need more than max_segments pieces. Returns
+    [(start, end, path)]; the caller deletes the files.
+    """
+    segments: List[Tuple[float, float, str]] = []
+    with av.open(path) as container:
+        if not container.streams.video:
+            return []
+        duration = container.duration / av.time_base if container.duration else 0.0
+        if duration and duration / segment_seconds > max_segments:
+            segment_seconds = duration / max_segments
+
+        video = container.streams.video[0]
+        streams = [video] + list(container.streams.audio[:1])
+        suffix = os.path.splitext(path)[1] or ".mp4"
+
+        output = None
+        mapping: dict = {}
+        offsets: dict = {}
+        start = 0.0
+        next_cut = segment_seconds
+        last_time = 0.0
+
+        def close():
+            output.close()
+            segments.append((start, last_time, piece_path))
+
+        for packet in container.demux(streams):
+            if packet.dts is None:
+                continue
+            t = float(packet.pts * packet.time_base) if packet.pts is not None else last_time
+            is_cut = packet.stream is video and packet.is_keyframe and (output is None or t >= next_cut)
+            if is_cut:
+                if output is not None:
+                    close()
+                    start = t
+                    next_cut = t + segment_seconds
+                fd, piece_path = tempfile.mkstemp(suffix=suffix, prefix="praxis-seg-")
+                os.close(fd)
+                output = av.open(piece_path, "w")
+                mapping = {s.index: _copy_stream(output, s) for s in streams}
+                offsets = {}
+            if output is None:
+                continue   # leading packets before the first keyframe
+
+            # Rebase each stream's timestamps to start at zero in its piece
+            offset = offsets.setdefault(packet.stream.index, packet.dts)
+            packet.dts -= offset
+            if packet.pts is not None:
+                packet.pts -= offset
+            packet.stream = mapping[packet.stream.index]
+            output.mux(packet)
+            last_time = max(last_time, t)
+
+        if output is not None:
+            close()
+    return segments
@@ -0,0 +1,158 @@
+"""
+Prometheus metrics for the upload hot path.
+
+stage("name") times a block into the praxis_stage_seconds histogram. Inside
+an HTTP request it is also added to that request's Server-Timing header
+when MetricsMiddleware has server_timing on. Values that other modules
+already count (cache hits, admission lanes, ...) are exported at scrape
+time through add_snapshot() instead of being counted twice.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, ProcessCollector, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+registry = CollectorRegistry()
+ProcessCollector(registry=registry)   # RSS, CPU, open fds
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80, 160, 320)
+
+stage_seconds = Histogram(
+    "praxis_stage_seconds",
+    "Time spent in each stage of upload processing",
+    ["stage"],
+    buckets=BUCKETS,
+    registry=registry,
+)
+http_request_seconds = Histogram(
+    "praxis_http_request_seconds",
+    "HTTP request duration (until the response starts for streaming responses)",
+    ["method", "route", "status"],
+    buckets=BUCKETS,
+    registry=registry,
+)
+uploads_total = Counter(
+    "praxis_uploads_total",
+    "Uploads (and batches) that finished processing",
+    ["status"],
+    registry=registry,
+)
+gemini_errors_total = Counter(
+    "praxis_gemini_errors_total",
+    "Failed Gemini API attempts (including ones that were retried)",
+    ["error_class"],
+    registry=registry,
+)
+background_errors_total = Counter(
+    "praxis_background_errors_total",
+    "Failures in work done outside a request (profile updates, sweeps, warm-up)",
+    ["task", "error_class"],
+    registry=registry,
+)
+
+# Per-request stage timings for Server-Timing: list of (stage, seconds)
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def stage(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def record_stage(name: str, seconds: float):
+    stage_seconds.labels(name).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+# ── Scrape-time values ───────────────────────────────────────────────────────
+
+class _SnapshotCollector:
+    """Calls each registered snapshot function on scrape.
+
+    A function returns {metric_name: (kind, help, {label_tuple: value}, label_names)}
+    with kind "gauge" or "counter".
+    """
+
+    def __init__(self):
+        self.sources: List[Callable[[], Dict[str, tuple]]] = []
+
+    def collect(self) -> Iterable:
+        for source in self.sources:
+            for name, (kind, help_text, values, label_names) in source().items():
+                family_cls = CounterMetricFamily if kind == "counter" else GaugeMetricFamily
+                family = family_cls(name, help_text, labels=label_names)
+                for labels, value in values.items():
+                    family.add_metric(list(labels), value)
+                yield family
+
+
+_snapshots = _SnapshotCollector()
+registry.register(_snapshots)
+
+
+def add_snapshot(source: Callable[[], Dict[str, tuple]]):
+    _snapshots.sources.append(source)
+
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+def render() -> bytes:
+    return generate_latest(registry)
+
+
+# ── ASGI middleware ──────────────────────────────────────────────────────────
+
+class MetricsMiddleware:
+    """Times every HTTP request and optionally adds a Server-Timing header."""
+
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timings: List[Tuple[str, float]] = []
+        token = _request_timings.set(timings)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                # Observed here so long-lived streams (SSE) count time to first byte
+                self._observe(scope, status["code"], time.perf_counter() - start)
+                status["observed"] = True
+                if self.server_timing:
+                    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings]
+                    entries.append(f"app;dur={(time.perf_counter() - start) * 1000:.1f}")
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [(b"server-timing", ", ".join(entries).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_timings.reset(token)
+            if not status.get("observed"):
+                self._observe(scope, status["code"], time.perf_counter() - start)
+
+    @staticmethod
+    def _observe(scope, status_code: int, seconds: float):
+        # Label by route template (/users/{user_id}/skills), never the raw path, so
+        # IDs and random paths can't blow up cardinality
+        route = getattr(scope.get("route"), "path", None) or "unmatched"
+        http_request_seconds.labels(scope.get("method", ""), route, str(status_code)).observe(seconds)
@@ -0,0 +1,144 @@
+"""
+Per-user skill profiles, merged incrementally from each finished upload.
+
+One record per user_id, kept in a result-store backend of its own (see
+store.py), so serving /users/{id}/skills or /jobs is a single lookup:
+
+    {"user_id", "status": "ready", "uploads", "updated_at", "summary",
+     "skills": [<Skill fields> + "evidence", ...],   # already in response order
+     "jobs": [...], "match_signature": [[key, level], ...],
+     "media": [<sha256 of each merged upload>, ...]}
+
+Skills are keyed as within one upload (isco.skill_key): canonical ID for
+exact synonym hits, normalized name otherwise. A merge keeps the highest
+level seen and averages confidence weighted by evidence, the number of
+uploads that showed the skill. Jobs only need re-matching when the
+signature (the set of skill keys and levels) changes.
+
+Media already merged (a retry, or the same clip uploaded twice) is skipped
+so it can't count as new evidence. Every change is one store.modify() call,
+i.e. a single transaction, so concurrent uploads of one user in different
+worker processes can't overwrite each other's merge. Job matching runs
+between two such calls, and its result is only kept if the skills haven't
+moved on in the meantime.
+"""
+
+from typing import Dict, List, Optional
+import time
+
+import isco
+from store import ResultStore
+
+# Hashes of merged media kept per profile (oldest dropped first)
+MAX_MEDIA_HASHES = 1000
+
+
+def skill_key(skill: dict) -> str:
+    return isco.skill_key(skill["name"], skill.get("skill_id"), skill.get("canonical_match"))
+
+
+def match_signature(skills: List[dict]) -> list:
+    """What job matching depends on: skill keys and levels (names and confidence don't move matches)."""
+    # Lists, not tuples, so it compares equal after a JSON round trip through the store
+    return [list(pair) for pair in sorted({(skill_key(s), s["level"]) for s in skills})]
+
+
+def _merge_into(existing: dict, new: dict) -> dict:
+    evidence = existing.get("evidence", 1)
+    merged = dict(existing, level=max(existing["level"], new["level"]), evidence=evidence + 1)
+    merged["verified"] = existing.get("verified", False) or new.get("verified", False)
+    if new.get("confidence") is not None:
+        if existing.get("confidence") is None:
+            merged["confidence"] = new["confidence"]
+        else:
+            merged["confidence"] = round((existing["confidence"] * evidence + new["confidence"]) / (evidence + 1), 4)
+    return merged
+
+
+def merge_skills(profile_skills: List[dict], upload_skills: List[dict]) -> List[dict]:
+    """Fold one upload's skills into a profile's, returned ranked by level then confidence."""
+    by_key: Dict[str, dict] = {skill_key(s): s for s in profile_skills}
+
+    # One upload is one piece of evidence, even if it names a skill twice
+    upload: Dict[str, dict] = {}
+    for skill in upload_skills:
+        key = skill_key(skill)
+        upload[key] = _merge_into(upload[key], skill) if key in upload else skill
+
+    for key, skill in upload.items():
+        if key in by_key:
+            by_key[key] = _merge_into(by_key[key], skill)
+        else:
+            by_key[key] = dict(skill, evidence=1)
+
+    return sorted(by_key.values(), key=lambda s: (-s["level"], -(s.get("confidence") or 0), s["name"]))
+
+
+class SkillProfiles:
+    def __init__(self, store: ResultStore):
+        self.store = store
+
+    async def get(self, user_id: str) -> Optional[dict]:
+        return await self.store.get(user_id)
+
+    async def add_upload(
+        self, user_id: str, media_key: str, skills: List[dict], summary: str, jobs: List[dict]
+    ) -> Optional[dict]:
+        """Merge one finished upload's skills; returns the saved profile, or None if media_key was merged before.
+
+        When the merged skill set is exactly this upload's (e.g. the user's
+        first upload), its jobs are adopted as the profile's.
+        """
+        merged = {"done": False}
+
+        def merge(profile: Optional[dict]) -> Optional[dict]:
+            profile = profile or self.new(user_id)
+            if media_key in profile["media"]:
+                return None
+            profile["media"] = (profile["media"] + [media_key])[-MAX_MEDIA_HASHES:]
+            profile["skills"] = merge_skills(profile["skills"], skills)
+            profile["uploads"] += 1
+            profile["summary"] = summary
+            profile["updated_at"] = time.time()
+            signature = match_signature(profile["skills"])
+            if signature != profile["match_signature"] and signature == match_signature(skills):
+                profile["jobs"] = jobs
+                profile["match_signature"] = signature
+            merged["done"] = True
+            return profile
+
+        profile = await self.store.modify(user_id, merge)
+        return profile if merged["done"] else None
+
+    async def set_jobs(self, user_id: str, signature: list, jobs: List[dict]) -> bool:
+        """Store jobs matched for `signature`, unless a newer upload has changed the skills since."""
+        def apply(profile: Optional[dict]) -> Optional[dict]:
+            if profile is None or match_signature(profile["skills"]) != signature:
+                return None
+            profile["jobs"] = jobs
+            profile["match_signature"] = signature
+            profile["updated_at"] = time.time()
+            return profile
+
+        profile = await self.store.modify(user_id, apply)
+        return profile is not None and profile["match_signature"] == signature
+
+    @staticmethod
+    def needs_matching(profile: dict) -> bool:
+        return match_signature(profile["skills"]) != profile["match_signature"]
+
+    @staticmethod
+    def new(user_id: str) -> dict:
+        return {
+            "user_id": user_id,
+            "status": "ready",
+            "uploads": 0,
+            "summary": None,
+            "skills": [],
+            "jobs": [],
+            "match_signature": None,
+            "media": [],
+        }
+
+    async def count(self) -> int:
+        return await self.store.count()
@@ -0,0 +1,229 @@
+"""
+Result store: one JSON record per processing ID.
+
+A record holds the upload metadata (user_id, status, media_type, ...) and,
+once processing finishes, the analysis/skills/jobs as plain dicts. Two
+backends share the same async interface:
+
+- MemoryStore: per-process dict; fine for a single uvicorn worker.
+- SQLiteStore: a WAL-mode SQLite file that several worker processes on the
+  same host can share, so a status poll can land on any worker.
+
+Records expire `ttl_seconds` after they were created. The same backends
+hold per-user skill profiles (profiles.py) in a separate table.
+"""
+
+from collections import OrderedDict
+from typing import Callable, List, Optional
+import asyncio
+import copy
+import json
+import sqlite3
+import threading
+import time
+
+
+class ResultStore:
+    async def create(self, processing_id: str, record: dict):
+        raise NotImplementedError
+
+    async def update(self, processing_id: str, **fields):
+        raise NotImplementedError
+
+    async def get(self, processing_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def delete(self, processing_id: str):
+        raise NotImplementedError
+
+    async def purge_expired(self) -> int:
+        raise NotImplementedError
+
+    async def count(self) -> int:
+        raise NotImplementedError
+
+    async def modify(self, key: str, fn: Callable[[Optional[dict]], Optional[dict]]) -> Optional[dict]:
+        """Atomically read-modify-write one record.
+
+        fn gets a copy of the live record (or None) and returns the record to
+        store, restarting its TTL, or None to leave it as is. fn must not
+        block: for SQLite it runs inside the write transaction.
+        """
+        raise NotImplementedError
+
+
+class MemoryStore(ResultStore):
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._records: "OrderedDict[str, tuple]" = OrderedDict()   # id -> (expires_at, record)
+
+    async def create(self, processing_id: str, record: dict):
+        # Re-creating a record moves it to the back, keeping expiry order for purge_expired
+        self._records.pop(processing_id, None)
+        self._records[processing_id] = (time.time() + self.ttl_seconds, dict(record))
+        while len(self._records) > self.max_entries:
+            self._records.popitem(last=False)
+
+    async def update(self, processing_id: str, **fields):
+        entry = self._records.get(processing_id)
+        if entry is not None:
+            entry[1].update(fields)
+
+    async def get(self, processing_id: str) -> Optional[dict]:
+        entry = self._records.get(processing_id)
+        if entry is None or entry[0] < time.time():
+            return None
+        return entry[1]
+
+    async def delete(self, processing_id: str):
+        self._records.pop(processing_id, None)
+
+    async def purge_expired(self) -> int:
+        now = time.time()
+        # Records are inserted in creation order with a fixed TTL, so expired ones are at the front
+        purged = 0
+        while self._records:
+            key, (expires_at, _) = next(iter(self._records.items()))
+            if expires_at >= now:
+                break
+            del self._records[key]
+            purged += 1
+        return purged
+
+    async def count(self) -> int:
+        return len(self._records)
+
+    async def modify(self, key: str, fn: Callable[[Optional[dict]], Optional[dict]]) -> Optional[dict]:
+        # No await between read and write, so nothing else on the loop can interleave
+        entry = self._records.get(key)
+        current = entry[1] if entry is not None and entry[0] >= time.time() else None
+        record = fn(copy.deepcopy(current))
+        if record is None:
+            return current
+        await self.create(key, record)
+        return record
+
+
+class SQLiteStore(ResultStore):
+    def __init__(self, path: str, ttl_seconds: float, table: str = "results"):
+        self.ttl_seconds = ttl_seconds
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS {table} (
+                id         TEXT PRIMARY KEY,
+                user_id    TEXT,
+                status     TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                data       TEXT NOT NULL
+            )
+            """.format(table=table)
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_expires_at ON {table} (expires_at)")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_user_id ON {table} (user_id)")
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _create(self, processing_id: str, record: dict):
+        self._execute(
+            f"INSERT OR REPLACE INTO {self.table} (id, user_id, status, expires_at, data) VALUES (?, ?, ?, ?, ?)",
+            (
+                processing_id,
+                record.get("user_id"),
+                record.get("status", "queued"),
+                time.time() + self.ttl_seconds,
+                json.dumps(record, ensure_ascii=False),
+            ),
+        )
+
+    def _update(self, processing_id: str, fields: dict):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(f"SELECT data FROM {self.table} WHERE id = ?", (processing_id,)).fetchone()
+                if row is not None:
+                    record = json.loads(row[0])
+                    record.update(fields)
+                    self._conn.execute(
+                        f"UPDATE {self.table} SET status = ?, data = ? WHERE id = ?",
+                        (record.get("status"), json.dumps(record, ensure_ascii=False), processing_id),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _get(self, processing_id: str) -> Optional[dict]:
+        rows = self._execute(
+            f"SELECT data FROM {self.table} WHERE id = ? AND expires_at >= ?",
+            (processing_id, time.time()),
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    async def create(self, processing_id: str, record: dict):
+        await asyncio.to_thread(self._create, processing_id, record)
+
+    async def update(self, processing_id: str, **fields):
+        await asyncio.to_thread(self._update, processing_id, fields)
+
+    async def get(self, processing_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self._get, processing_id)
+
+    async def delete(self, processing_id: str):
+        await asyncio.to_thread(self._execute, f"DELETE FROM {self.table} WHERE id = ?", (processing_id,))
+
+    async def purge_expired(self) -> int:
+        def purge():
+            with self._lock:
+                return self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at < ?", (time.time(),)).rowcount
+        return await asyncio.to_thread(purge)
+
+    async def count(self) -> int:
+        rows = await asyncio.to_thread(self._execute, f"SELECT COUNT(*) FROM {self.table}")
+        return rows[0][0]
+
+    def _modify(self, key: str, fn: Callable[[Optional[dict]], Optional[dict]]) -> Optional[dict]:
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front, so other worker
+            # processes can't read the same version and overwrite this change
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT data FROM {self.table} WHERE id = ? AND expires_at >= ?", (key, time.time())
+                ).fetchone()
+                current = json.loads(row[0]) if row else None
+                record = fn(json.loads(row[0]) if row else None)
+                if record is not None:
+                    self._conn.execute(
+                        f"INSERT OR REPLACE INTO {self.table} (id, user_id, status, expires_at, data) VALUES (?, ?, ?, ?, ?)",
+                        (
+                            key,
+                            record.get("user_id"),
+                            record.get("status", "queued"),
+                            time.time() + self.ttl_seconds,
+                            json.dumps(record, ensure_ascii=False),
+                        ),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return record if record is not None else current
+
+    async def modify(self, key: str, fn: Callable[[Optional[dict]], Optional[dict]]) -> Optional[dict]:
+        return await asyncio.to_thread(self._modify, key, fn)
+
+
+def create_store(backend: str, ttl_seconds: float, sqlite_path: str = "praxis.db", table: str = "results") -> ResultStore:
+    if backend == "sqlite":
+        return SQLiteStore(sqlite_path, ttl_seconds, table)
+    if backend == "memory":
+        return MemoryStore(ttl_seconds)
+    raise ValueError(f"Unknown RESULT_STORE backend: {backend!r} (expected 'memory' or 'sqlite')")
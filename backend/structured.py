@@ -0,0 +1,313 @@
+"""
+Structured output from Gemini.
+
+- response_schema(): a Pydantic model as the OpenAPI-style schema Gemini's
+  JSON response mode accepts (the SDK's own conversion chokes on defaults
+  and Optional fields).
+- parse(): validate a response in one pass with model_validate_json and,
+  if that fails, fall back to recover_json() + salvage() so one bad token
+  costs a field or a list item instead of the whole analysis.
+- StreamParser: the complete values of a streamed response so far, parsed
+  incrementally as chunks arrive.
+"""
+
+from typing import Any, List, Optional, Tuple, Type, TypeVar
+import json
+
+from pydantic import BaseModel, ValidationError
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class UnparseableResponse(ValueError):
+    pass
+
+
+# ── Schema conversion ────────────────────────────────────────────────────────
+
+def response_schema(model: Type[BaseModel]) -> dict:
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def convert(node: dict) -> dict:
+        if "$ref" in node:
+            return convert(defs[node["$ref"].rsplit("/", 1)[-1]])
+        if "anyOf" in node:
+            options = [o for o in node["anyOf"] if o.get("type") != "null"]
+            out = convert(options[0])
+            if len(options) < len(node["anyOf"]):
+                out["nullable"] = True
+            return out
+
+        out = {"type": node["type"]}
+        if "description" in node:
+            out["description"] = node["description"]
+        if "enum" in node:
+            out["enum"] = node["enum"]
+        if node["type"] == "object":
+            out["properties"] = {name: convert(prop) for name, prop in node["properties"].items()}
+            # Ask for every field the model can't leave out, even ones we default
+            out["required"] = [name for name, prop in out["properties"].items() if not prop.get("nullable")]
+        elif node["type"] == "array":
+            out["items"] = convert(node["items"])
+        return out
+
+    return convert(schema)
+
+
+# ── Recovery ─────────────────────────────────────────────────────────────────
+
+def strip_fences(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```"):
+        lines = text.splitlines()
+        text = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
+    return text
+
+
+def _close_truncated(text: str) -> Optional[str]:
+    """Cut text back to the last complete value and close the open brackets."""
+    stack: List[str] = []
+    expect_value = False      # inside an object, after ':'
+    in_string = escaped = False
+    string_is_value = False
+    safe: Optional[Tuple[int, str]] = None   # (cut index, closers)
+
+    def closers() -> str:
+        return "".join("}" if c == "{" else "]" for c in reversed(stack))
+
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+                if string_is_value:
+                    safe = (i + 1, closers())
+            continue
+        if ch == '"':
+            in_string = True
+            string_is_value = not stack or stack[-1] == "[" or expect_value
+        elif ch in "{[":
+            stack.append(ch)
+            expect_value = False
+            safe = (i + 1, closers())
+        elif ch in "}]":
+            if not stack:
+                break
+            stack.pop()
+            expect_value = False
+            safe = (i + 1, closers())
+            if not stack:
+                break
+        elif ch == ":":
+            expect_value = True
+        elif ch == ",":
+            safe = (i, closers())
+            expect_value = False
+
+    if safe is None:
+        return None
+    cut, close = safe
+    return text[:cut] + close
+
+
+def recover_json(text: str) -> Optional[Any]:
+    """Best-effort parse of fenced, prose-wrapped, truncated or corrupted JSON."""
+    text = strip_fences(text)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return None
+    start = min(starts)
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text, start)   # ignores trailing prose
+        return value
+    except json.JSONDecodeError as exc:
+        repaired = _close_truncated(text[start:exc.pos])
+    if repaired is None:
+        return None
+    try:
+        return json.loads(repaired)
+    except json.JSONDecodeError:
+        return None
+
+
+def salvage(model: Type[M], data: Any, max_passes: int = 20) -> M:
+    """Validate data, dropping list items and fields that fail until the rest passes."""
+    for _ in range(max_passes):
+        try:
+            return model.model_validate(data)
+        except ValidationError as exc:
+            if not isinstance(data, dict) or not _drop_invalid(data, exc.errors()):
+                raise UnparseableResponse(str(exc)) from None
+    raise UnparseableResponse(f"Could not salvage a valid {model.__name__}")
+
+
+def _drop_invalid(data: dict, errors: list) -> bool:
+    """Remove the offending fields so defaults apply; a list item missing a required field goes entirely."""
+    removals = set()
+    for error in errors:
+        loc = tuple(error["loc"])
+        if error["type"] == "missing":
+            items = [i for i, part in enumerate(loc) if isinstance(part, int)]
+            if not items:
+                continue
+            loc = loc[: items[-1] + 1]
+        removals.add(loc)
+    dropped = False
+    # Highest list index first so one removal doesn't shift the next
+    for loc in sorted(removals, key=lambda l: [(isinstance(p, str), p) for p in l], reverse=True):
+        parent: Any = data
+        try:
+            for part in loc[:-1]:
+                parent = parent[part]
+            del parent[loc[-1]]
+            dropped = True
+        except (KeyError, IndexError, TypeError):
+            continue
+    return dropped
+
+
+def parse(text: str, model: Type[M]) -> M:
+    """One-pass validation, falling back to recovery for malformed output."""
+    try:
+        return model.model_validate_json(text)
+    except ValidationError:
+        pass
+    data = recover_json(text)
+    if data is None:
+        raise UnparseableResponse("Gemini returned no parseable JSON")
+    return salvage(model, data)
+
+
+class StreamParser:
+    """Parses streamed response text incrementally, one chunk at a time.
+
+    The value under construction, the stack of open containers and any
+    half-read string or literal are kept between feed() calls, so each
+    chunk only scans its own text. Values only appear in snapshot() once
+    they are complete: strings once closed, numbers once followed by a
+    delimiter. Like recover_json(), text before the first bracket (e.g. a
+    code fence) and after the top-level value is ignored, and parsing stops
+    at the first malformed token, keeping what came before it.
+    """
+
+    _DELIMITERS = frozenset(",}] \t\r\n")
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._root: Any = None
+        self._stack: List[Any] = []     # open containers, innermost last
+        self._expect = "value"          # "key" | "colon" | "value" | "comma"
+        self._key: Optional[str] = None
+        self._string: Optional[List[str]] = None   # raw text of an open string
+        self._escaped = False
+        self._literal: Optional[str] = None        # number / true / false / null so far
+        self._done = False
+        self._changed = False
+
+    def feed(self, chunk: str) -> Optional[dict]:
+        """Add a chunk; returns the snapshot if a value completed in it, else None."""
+        self._chunks.append(chunk)
+        self._changed = False
+        for ch in chunk:
+            if self._done:
+                break
+            self._step(ch)
+        return self.snapshot() if self._changed else None
+
+    def snapshot(self) -> Optional[dict]:
+        """The complete values so far. Live: later feeds keep adding to it."""
+        return self._root if isinstance(self._root, dict) else None
+
+    @property
+    def text(self) -> str:
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def _step(self, ch: str):
+        if self._string is not None:
+            if self._escaped:
+                self._escaped = False
+            elif ch == "\\":
+                self._escaped = True
+            elif ch == '"':
+                self._end_string()
+                return
+            self._string.append(ch)
+            return
+        if self._literal is not None:
+            if ch not in self._DELIMITERS:
+                self._literal += ch
+                return
+            try:
+                value = json.loads(self._literal)
+            except ValueError:
+                self._done = True
+                return
+            self._literal = None
+            self._add(value)
+        if ch in " \t\r\n":
+            return
+        if self._root is None:
+            if ch in "{[":
+                self._open(ch)
+            return
+
+        expect, top = self._expect, self._stack[-1]
+        if ch == '"' and expect in ("key", "value"):
+            self._string = []
+        elif ch in "{[" and expect == "value":
+            self._open(ch)
+        elif ch == "}" and isinstance(top, dict) and expect in ("key", "comma"):
+            self._close()
+        elif ch == "]" and isinstance(top, list) and expect in ("value", "comma"):
+            self._close()
+        elif ch == "," and expect == "comma":
+            self._expect = "key" if isinstance(top, dict) else "value"
+        elif ch == ":" and expect == "colon":
+            self._expect = "value"
+        elif expect == "value" and ch in "-0123456789tfn":
+            self._literal = ch
+        else:
+            self._done = True   # malformed from here on
+
+    def _end_string(self):
+        try:
+            value = json.loads('"' + "".join(self._string) + '"')
+        except ValueError:
+            self._done = True
+            return
+        self._string = None
+        if self._expect == "key":
+            self._key = value
+            self._expect = "colon"
+        else:
+            self._add(value)
+
+    def _open(self, ch: str):
+        container: Any = {} if ch == "{" else []
+        if self._root is None:
+            self._root = container
+        else:
+            self._add(container)
+        self._stack.append(container)
+        self._expect = "key" if ch == "{" else "value"
+
+    def _close(self):
+        self._stack.pop()
+        self._expect = "comma"
+        if not self._stack:
+            self._done = True   # anything after the top-level value is ignored
+
+    def _add(self, value: Any):
+        top = self._stack[-1]
+        if isinstance(top, dict):
+            top[self._key] = value
+        else:
+            top.append(value)
+        self._expect = "comma"
+        self._changed = True
@@ -6,7 +6,7 @@ export interface GeminiAnalysis {
   confidence_score: number;       // 0.0–1.0
   language_detected?: string;
   raw_transcript?: string;
-  media_type: "video" | "image";
+  media_type: "video" | "image" | "batch";
 }
 
 export interface ProcessingResponse {
@@ -20,9 +20,33 @@ export interface ProcessingResponse {
 }
 
 export interface ProcessingStatusResponse {
-  status: "processing" | "done" | "failed";
+  status: "queued" | "processing" | "done" | "failed";
+  stage?: "queued" | "uploading" | "gemini_processing" | "extracting" | "matching" | "done" | "failed";
   analysis?: GeminiAnalysis;
   error?: string;
+  files?: BatchFileStatus[];      // only for /upload-batch
+  partial?: {                     // while Gemini is still generating
+    summary?: string;
+    skill_details: { name: string; level: number; confidence: number }[];
+  };
+  preprocess?: PreprocessStats;   // image uploads only
+  profile_error?: string;         // the upload is fine, but merging it into the user's profile failed
+}
+
+export interface PreprocessStats {
+  bytes_in: number;               // summed over the upload's images
+  bytes_out: number;              // as sent to Gemini
+  saved: number;
+}
+
+export interface BatchFileStatus {
+  filename: string;
+  media_type: "video" | "image";
+  sha256: string;
+  size_bytes: number;
+  status: "queued" | "processing" | "done" | "failed";
+  summary?: string;
+  error?: string;
 }
 
 export interface Skill {
@@ -30,20 +54,38 @@ export interface Skill {
   level: 1 | 2 | 3;
   verified: boolean;
   confidence?: number;            // 0.0–1.0 from Gemini
+  skill_id?: string;              // canonical ISCO-08 skill ID, e.g. "7112.bricklaying"
+  canonical_name?: string;
+  canonical_match?: "exact" | "fuzzy";  // fuzzy IDs are hints; such skills are never merged
 }
 
 export interface SkillsResponse {
   user: string;
   skills: Skill[];
   analysis?: GeminiAnalysis;
+  partial?: boolean;              // analysis still running; more skills may follow
   error?: string;
 }
 
+export interface ProfileSkill extends Skill {
+  evidence: number;               // uploads that showed this skill
+}
+
+// GET /users/{id}/skills: skills merged across the user's uploads
+export interface UserSkillsResponse {
+  user: string;
+  skills: ProfileSkill[];
+  uploads: number;
+  summary?: string;
+  updated_at: number;
+}
+
 export interface Job {
   title: string;
   match: number;  // 0-100
   salary?: string;
   reason?: string;
+  isco_code?: string;             // ISCO-08 unit group (local matcher)
 }
 
 export interface JobsResponse {
@@ -51,6 +93,24 @@ export interface JobsResponse {
   error?: string;
 }
 
+// GET /results?id=a,b: everything about several uploads in one call
+export interface ResultEntry {
+  id: string;
+  status: "queued" | "processing" | "done" | "failed" | "not_found";
+  stage?: string;
+  analysis?: GeminiAnalysis;
+  skills?: Skill[];
+  jobs?: Job[];
+  error?: string;
+  files?: BatchFileStatus[];
+  preprocess?: PreprocessStats;
+  profile_error?: string;
+}
+
+export interface ResultsResponse {
+  results: ResultEntry[];         // in request order
+}
+
 export interface User {
   id: string;
   phone: string;